@@ -3,6 +3,19 @@
 
 
 import enum
+import functools
+
+
+# The number of combinations of modifier and input is small, so the resulting strings are cached. (Enum methods can't be
+# decorated with 'functools.lru_cache' directly.) 'MODIFIER_KEY.NONE' is handled by the calling methods.
+@functools.lru_cache(maxsize=128)
+def _append(modifier, text, separator):
+    return text + separator + modifier
+
+
+@functools.lru_cache(maxsize=128)
+def _prepend(modifier, text, separator):
+    return modifier + separator + text
 
 
 class MODIFIER_KEY(enum.Enum):
@@ -19,8 +32,14 @@ class MODIFIER_KEY(enum.Enum):
     SHIFT_ALT_CTRL = "shift meta ctrl"
     
     def append_to(self, text, separator=" "):
-        return (text + separator + self.value) if (self != self.__class__.NONE) else text
+        return text if self._is_none else _append(self.value, text, separator)
     
     def prepend_to(self, text, separator=" "):
-        return (self.value + separator + text) if (self != self.__class__.NONE) else text
-    
\ No newline at end of file
+        return text if self._is_none else _prepend(self.value, text, separator)
+
+
+# Whether a member represents the absence of a modifier is determined only once, instead of comparing it on every call.
+for _member in MODIFIER_KEY:
+    _member._is_none = (_member is MODIFIER_KEY.NONE)
+
+del _member
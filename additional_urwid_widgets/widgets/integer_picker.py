@@ -3,12 +3,109 @@
 
 
 from ..assisting_modules.modifier_key import MODIFIER_KEY        # pylint: disable=unused-import
-from .selectable_row import SelectableRow
 
+import functools
 import sys      # pylint: disable=unused-import
 import urwid
 
 
+# Sentinels, which represent a jump to the limit at the top or at the bottom.
+_HOME = object()
+_END = object()
+
+
+# Specialized formatters for common syntaxes, which avoid parsing the syntax via 'str.format' on every change of the value.
+_FORMATTERS = {"{}": str,
+               "{:,}": lambda v: format(v, ",")}
+
+
+# Maps the modified keystrokes to their summands (or sentinels). Since pickers with the same configuration get identical
+# mappings, they are created only once. The returned dict is shared and therefore treated as read-only.
+@functools.lru_cache(maxsize=64)
+def _build_key_map(modifier_key, step_len, jump_len):
+    prepend = modifier_key.prepend_to
+    
+    return {prepend("up"): -step_len,
+            prepend("down"): step_len,
+            prepend("page up"): -jump_len,
+            prepend("page down"): jump_len,
+            prepend("home"): _HOME,
+            prepend("end"): _END}
+
+
+# During the initialization of 'urwid.AttrMap', the value can be passed as non-dict. After initializing, its value can be
+# manipulated by passing a dict. These dicts are only created when they are needed and are shared by all instances, since
+# 'urwid.AttrMap.set_attr_map' copies them anyway.
+@functools.lru_cache(maxsize=None)
+def _attr_dict(attr):
+    return {None: attr}
+
+
+class _SelectableText(urwid.Text):
+    """A selectable 'urwid.Text'. Since the display consists of only one column, this avoids the overhead of 'SelectableRow'."""
+
+    def __init__(self, markup, *, align="left", on_select=None):
+        super().__init__(markup, align=align)
+        
+        # A hook which defines the behavior that is executed when a specified key is pressed.
+        self.on_select = on_select
+    
+    def selectable(self):
+        return True
+    
+    def keypress(self, size, key):
+        if (key == "enter") and (self.on_select is not None):
+            self.on_select(self)
+            key = None
+            
+        return key
+
+
+class _PickerLayout(urwid.Widget):
+    """Stacks the top bar, the display and the bottom bar. Since this layout is fixed, it avoids the overhead of 'urwid.Pile'."""
+    
+    _sizing = frozenset([urwid.FIXED, urwid.FLOW])
+    _selectable = True
+    
+    def __init__(self, top_bar, display, bottom_bar):
+        super().__init__()
+        
+        self._top_bar = top_bar
+        self._display = display
+        self._bottom_bar = bottom_bar
+    
+    def rows(self, size, focus=False):
+        return (self._top_bar.rows(size)
+                + self._display.rows(size, focus=focus)
+                + self._bottom_bar.rows(size))
+    
+    def pack(self, size=(), focus=False):
+        if size:
+            return super().pack(size, focus)
+        
+        # As a fixed widget, the layout is as wide as its widest row (like 'urwid.Pile').
+        maxcol = max(self._top_bar.pack((), focus=False)[0],
+                     self._display.pack((), focus=focus)[0],
+                     self._bottom_bar.pack((), focus=False)[0])
+        
+        return (maxcol, self.rows((maxcol,), focus=focus))
+    
+    def render(self, size, focus=False):
+        if not size:
+            size = (self.pack((), focus=focus)[0],)
+        
+        # Only the display can be in focus.
+        return urwid.CanvasCombine([(self._top_bar.render(size), None, False),
+                                    (self._display.render(size, focus=focus), None, True),
+                                    (self._bottom_bar.render(size), None, False)])
+    
+    def keypress(self, size, key):
+        return self._display.keypress(size, key)
+    
+    def mouse_event(self, size, event, button, col, row, focus):
+        return False
+
+
 class IntegerPicker(urwid.WidgetWrap):
     """Serves as a selector for integer numbers."""
 
@@ -39,6 +136,15 @@ class IntegerPicker(urwid.WidgetWrap):
         # 'MODIFIER_KEY' changes the behavior, so that the widget responds only to modified input. ('up' => 'ctrl up')
         self._modifier_key = modifier_key
         
+        # A keystroke is changed to a modified one ('up' => 'ctrl up'). This prevents the widget from responding when the arrows 
+        # keys are used to navigate between widgets. That way it can be used in a 'urwid.Pile' or similar.
+        # The mapping is shared between instances with the same configuration, so it must not be altered.
+        self._key_map = _build_key_map(modifier_key, step_len, jump_len)
+        
+        # An event is changed to a modified one ('mouse press' => 'ctrl mouse press'). This prevents the original widget from
+        # responding when mouse buttons are also used to navigate between widgets.
+        self._mouse_key = modifier_key.prepend_to("mouse press")
+        
         # Specifies whether moving upwards represents a decrease or an increase of the value.
         self._ascending = ascending
         
@@ -53,39 +159,41 @@ class IntegerPicker(urwid.WidgetWrap):
         self._bottom_bar = urwid.AttrMap(urwid.Text("", bottomBar_align),
                                          None)
         
-        # During the initialization of 'urwid.AttrMap', the value can be passed as non-dict. After initializing, its value can be
-        # manipulated by passing a dict. The dicts I create below will be used later to change the appearance of the widgets.
-        self._topBar_endCovered_markup = topBar_endCovered_prop[0]
-        self._topBar_endCovered_focus = {None:topBar_endCovered_prop[1]}
-        self._topBar_endCovered_offFocus = {None:topBar_endCovered_prop[2]}
-        
-        self._topBar_endExposed_markup = topBar_endExposed_prop[0]
-        self._topBar_endExposed_focus = {None:topBar_endExposed_prop[1]}
-        self._topBar_endExposed_offFocus = {None:topBar_endExposed_prop[2]}
-        
-        self._bottomBar_endCovered_markup = bottomBar_endCovered_prop[0]
-        self._bottomBar_endCovered_focus = {None:bottomBar_endCovered_prop[1]}
-        self._bottomBar_endCovered_offFocus = {None:bottomBar_endCovered_prop[2]}
-        
-        self._bottomBar_endExposed_markup = bottomBar_endExposed_prop[0]
-        self._bottomBar_endExposed_focus = {None:bottomBar_endExposed_prop[1]}
-        self._bottomBar_endExposed_offFocus = {None:bottomBar_endExposed_prop[2]}
+        # The properties of the bars consist of the markup, the attribute on focus and the attribute off focus.
+        self._topBar_endCovered_prop = topBar_endCovered_prop
+        self._topBar_endExposed_prop = topBar_endExposed_prop
+        self._bottomBar_endCovered_prop = bottomBar_endCovered_prop
+        self._bottomBar_endExposed_prop = bottomBar_endExposed_prop
         
         # Format the number before displaying it. That way it is easier to read.
         self._display_syntax = display_syntax
+        self._fmt = _FORMATTERS.get(display_syntax, display_syntax.format)
+        
+        # The last displayed string is stored, so that the display is only updated if the string has actually changed.
+        self._last_formatted = self._fmt(value)
         
         # The current value is displayed via this widget.
-        self._display = SelectableRow([display_syntax.format(value)],
-                                     align=display_align)
+        self._display = _SelectableText(self._last_formatted,
+                                        align=display_align)
+        
+        # The bound method is resolved only once, since it is called on every change of the value.
+        self._set_display = self._display.set_text
         
         display_attr = urwid.AttrMap(self._display,
                                      display_prop[1],
                                      display_prop[0])
         
-        # wrap 'urwid.Pile'
-        super().__init__(urwid.Pile([self._top_bar,
-                                     display_attr,
-                                     self._bottom_bar]))
+        # Caches which bar states were applied during the last rendering, so that the bars are only updated if necessary.
+        self._last_render_state = None
+        
+        # The markup and the attribute (by id) that were last applied to the respective bar.
+        self._top_state = (None, None)
+        self._bottom_state = (None, None)
+        
+        # Wrap the three rows.
+        super().__init__(_PickerLayout(self._top_bar,
+                                       display_attr,
+                                       self._bottom_bar))
         
         # Is 'on_selection_change' triggered during the initialization?
         if initialization_is_selection_change and (on_selection_change is not None):
@@ -99,59 +207,69 @@ class IntegerPicker(urwid.WidgetWrap):
                                                                                self._ascending)
             
     def render(self, size, focus=False):
+        top_end_exposed = self._value == (self._minimum if self._ascending else self._maximum)
+        bottom_end_exposed = self._value == (self._maximum if self._ascending else self._minimum)
+        
+        state = (top_end_exposed, bottom_end_exposed, focus)
+        
+        # The bars only need to be updated if their state has changed since the last rendering.
+        if state == self._last_render_state:
+            return super().render(size, focus=focus)
+        
         # Changes the appearance of the bar at the top depending on whether the upper limit is reached.
-        if self._value == (self._minimum if self._ascending else self._maximum):
-            self._top_bar.original_widget.set_text(self._topBar_endExposed_markup)
-            self._top_bar.set_attr_map(self._topBar_endExposed_focus
-                                       if focus else self._topBar_endExposed_offFocus)
-        else:
-            self._top_bar.original_widget.set_text(self._topBar_endCovered_markup)
-            self._top_bar.set_attr_map(self._topBar_endCovered_focus
-                                       if focus else self._topBar_endCovered_offFocus)
+        top_prop = self._topBar_endExposed_prop if top_end_exposed else self._topBar_endCovered_prop
+        
+        self._apply_bar(self._top_bar,
+                        "_top_state",
+                        top_prop[0],
+                        _attr_dict(top_prop[1] if focus else top_prop[2]))
         
         # Changes the appearance of the bar at the bottom depending on whether the lower limit is reached.
-        if self._value == (self._maximum if self._ascending else self._minimum):
-            self._bottom_bar.original_widget.set_text(self._bottomBar_endExposed_markup)
-            self._bottom_bar.set_attr_map(self._bottomBar_endExposed_focus
-                                          if focus else self._bottomBar_endExposed_offFocus)
-        else:
-            self._bottom_bar.original_widget.set_text(self._bottomBar_endCovered_markup)
-            self._bottom_bar.set_attr_map(self._bottomBar_endCovered_focus
-                                          if focus else self._bottomBar_endCovered_offFocus)
-            
+        bottom_prop = self._bottomBar_endExposed_prop if bottom_end_exposed else self._bottomBar_endCovered_prop
+        
+        self._apply_bar(self._bottom_bar,
+                        "_bottom_state",
+                        bottom_prop[0],
+                        _attr_dict(bottom_prop[1] if focus else bottom_prop[2]))
+        
+        self._last_render_state = state
+        
         return super().render(size, focus=focus)
     
-    def keypress(self, size, key):
-        # A keystroke is changed to a modified one ('up' => 'ctrl up'). This prevents the widget from responding when the arrows 
-        # keys are used to navigate between widgets. That way it can be used in a 'urwid.Pile' or similar.
-        if key == self._modifier_key.prepend_to("up"):
-            successful = self._change_value(-self._step_len)
+    # Changes the markup and the attribute of a bar, but only if they differ from the ones applied last. (The attribute dicts are
+    # stable references, so they are compared by their id.)
+    def _apply_bar(self, bar, state_attr, markup, attr):
+        last_markup, last_attr_id = getattr(self, state_attr)
         
-        elif key == self._modifier_key.prepend_to("down"):
-            successful = self._change_value(self._step_len)
+        if markup != last_markup:
+            bar.original_widget.set_text(markup)
         
-        elif key == self._modifier_key.prepend_to("page up"):
-            successful = self._change_value(-self._jump_len)
+        if id(attr) != last_attr_id:
+            bar.set_attr_map(attr)
         
-        elif key == self._modifier_key.prepend_to("page down"):
-            successful = self._change_value(self._jump_len)
+        setattr(self, state_attr, (markup, id(attr)))
+    
+    def keypress(self, size, key):
+        # The modified keystrokes are looked up in the precomputed mapping, which provides the corresponding summand.
+        summand = self._key_map.get(key)
         
-        elif key == self._modifier_key.prepend_to("home"):
-            successful = self._change_value(float("-inf"))
+        if summand is None:
+            return key
         
-        elif key == self._modifier_key.prepend_to("end"):
-            successful = self._change_value(float("inf"))
+        if summand is _HOME:
+            successful = self._goto(self._minimum if self._ascending else self._maximum)
+        
+        elif summand is _END:
+            successful = self._goto(self._maximum if self._ascending else self._minimum)
         
         else:
-            successful = False
+            successful = self._change_value(summand)
         
-        return key if not successful else None
+        return None if successful else key
     
     def mouse_event(self, size, event, button, col, row, focus):
         if focus:
-            # An event is changed to a modified one ('mouse press' => 'ctrl mouse press'). This prevents the original widget from
-            # responding when mouse buttons are also used to navigate between widgets.
-            if event == self._modifier_key.prepend_to("mouse press"):
+            if event == self._mouse_key:
                 # mousewheel up
                 if button == 4.0:
                     result = self._change_value(-self._jump_len)
@@ -166,67 +284,65 @@ class IntegerPicker(urwid.WidgetWrap):
     
     # This method tries to change the value depending on the desired arrangement and returns True if this change was successful.
     def _change_value(self, summand):
+        # In a descending arrangement, moving upwards increases the value.
+        effective_summand = summand if self._ascending else -summand
+        
+        # If the corresponding limit has already been reached, then determine whether the unused input should be returned or
+        # swallowed.
+        if (effective_summand < 0) and (self._value == self._minimum):
+            return not self._return_unused_navigation_input
+        
+        if (effective_summand > 0) and (self._value == self._maximum):
+            return not self._return_unused_navigation_input
+        
         value_before_input = self._value
+        new_value = self._value + effective_summand
         
-        if self._ascending:
-            new_value = self._value + summand
-            
-            if summand < 0:
-                # If the corresponding limit has already been reached, then determine whether the unused input should be
-                # returned or swallowed.
-                if self._value == self._minimum:
-                    return not self._return_unused_navigation_input
-                
-                # If the new value stays within the permitted range, use it.
-                elif new_value > self._minimum:
-                    self._value = new_value
-                
-                # The permitted range would be exceeded, so the limit is set instead.
-                else:
-                    self._value = self._minimum
-            
-            elif summand > 0:
-                if self._value == self._maximum:
-                    return not self._return_unused_navigation_input
-                
-                elif new_value < self._maximum:
-                    self._value = new_value
-                
-                else:
-                    self._value = self._maximum
-        else:
-            new_value = self._value - summand
-            
-            if summand < 0:
-                if self._value == self._maximum:
-                    return not self._return_unused_navigation_input
-                
-                elif new_value < self._maximum:
-                    self._value = new_value
-                
-                else:
-                    self._value = self._maximum
-            
-            elif summand > 0:
-                if self._value == self._minimum:
-                    return not self._return_unused_navigation_input
-                
-                elif new_value > self._minimum:
-                    self._value = new_value
-                
-                else:
-                    self._value = self._minimum
+        # If the permitted range would be exceeded, the limit is set instead.
+        if new_value < self._minimum:
+            new_value = self._minimum
+        
+        elif new_value > self._maximum:
+            new_value = self._maximum
+        
+        self._value = new_value
+        
+        # Identical objects are detected without comparing their values, which is costly for large integers.
+        value_has_changed = (new_value is not value_before_input) and (new_value != value_before_input)
+        
+        if value_has_changed:
+            self._last_render_state = None
         
         # Update the displayed value.
-        self._display.set_contents([self._display_syntax.format(self._value)])
+        self._update_display()
         
         # If the value has changed, execute the hook (if existing).
-        if (value_before_input != self._value) and (self.on_selection_change is not None):
+        if value_has_changed and (self.on_selection_change is not None):
             self.on_selection_change(value_before_input,
-                                     self._value)
+                                     new_value)
         
         return True
     
+    # This method jumps directly to the passed limit and returns True if this change was successful. That way no arithmetic is
+    # needed, which would otherwise convert the integer to a float.
+    def _goto(self, target):
+        # If the limit has already been reached, then determine whether the unused input should be returned or swallowed.
+        if self._value == target:
+            return not self._return_unused_navigation_input
+        
+        self.set_value(target)
+        
+        return True
+    
+    # Updates the display, unless the formatted value is identical to the one displayed. That way the display is only invalidated
+    # on real transitions, but never on inputs which don't change the value (e.g. when a limit has already been reached).
+    def _update_display(self):
+        formatted = self._fmt(self._value)
+        
+        if formatted != self._last_formatted:
+            self._set_display(formatted)
+            self._last_formatted = formatted
+    
     def get_value(self):
         return self._value
     
@@ -234,12 +350,13 @@ class IntegerPicker(urwid.WidgetWrap):
         if not (self._minimum <= value <= self._maximum):
             raise ValueError("'minimum <= value <= maximum' must be True.")
             
-        if value != self._value:
+        if (value is not self._value) and (value != self._value):
             value_before_change = self._value
             self._value = value
+            self._last_render_state = None
             
             # Update the displayed value.
-            self._display.set_contents([self._display_syntax.format(self._value)])
+            self._update_display()
             
             # Execute the hook (if existing).
             if (self.on_selection_change is not None):
@@ -256,6 +373,7 @@ class IntegerPicker(urwid.WidgetWrap):
             raise ValueError("'new_min' must be less than or equal to the maximum value.")
         
         self._minimum = new_min
+        self._last_render_state = None
         
         if self._value < new_min:
             self.set_to_minimum()
@@ -265,6 +383,7 @@ class IntegerPicker(urwid.WidgetWrap):
             raise ValueError("'new_max' must be greater than or equal to the minimum value.")
         
         self._maximum = new_max
+        self._last_render_state = None
         
         if self._value > new_max:
             self.set_to_maximum()
@@ -14,6 +14,9 @@ class SelectableRow(urwid.WidgetWrap):
         # A list-like object, where each element represents the value of a column.
         self.contents = contents
         
+        # A private snapshot of the displayed values. (The list record belongs to the caller and may be altered inplace.)
+        self._displayed = list(contents)
+        
         self._columns = urwid.Columns([urwid.Text(c, align=align) for c in contents],
                                        dividechars=space_between)
         
@@ -38,10 +41,12 @@ class SelectableRow(urwid.WidgetWrap):
         return key
     
     def set_contents(self, contents):
-        # Update the list record inplace...
-        self.contents[:] = contents
+        # Update the displayed items, but only those that have actually changed, since 'urwid.Text.set_text' always
+        # invalidates the canvas...
+        for i, (t, (w, _)) in enumerate(zip(contents, self._columns.contents)):
+            if self._displayed[i] != t:
+                w.set_text(t)
+                self._displayed[i] = t
         
-        # ... and update the displayed items.
-        for t, (w, _) in zip(contents, self._columns.contents):
-            w.set_text(t)
-            
+        # ... and update the list record inplace.
+        self.contents[:] = contents
@@ -336,7 +336,7 @@ class IntegerPicker(urwid.WidgetWrap):
 
 
 # Demonstration
-if __name__ == "__main__":
+def main():
     # Color schemes that specify the appearance off focus and on focus.
     PALETTE = [("reveal_focus",              "black",             "white"),
                ("ip_display_focus",          "black",             "brown",   "standout"),
@@ -483,3 +483,7 @@ if __name__ == "__main__":
                           PALETTE,
                           unhandled_input=keypress)
     loop.run()
+
+
+if __name__ == "__main__":
+    main()